@@ -0,0 +1,43 @@
+"""Add text content, content hash and simhash fingerprint columns to document table
+
+Revision ID: 3a2b3c4d5e6f
+Revises: 2a2b3c4d5e6f
+Create Date: 2026-10-19 10:12:31.482911
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = '3a2b3c4d5e6f'
+down_revision = '2a2b3c4d5e6f'
+branch_labels = None
+depends_on = None
+
+BAND_COLUMNS = ['simhash_band_0', 'simhash_band_1', 'simhash_band_2', 'simhash_band_3']
+
+def upgrade():
+    # Batch mode recreates the table on SQLite, which cannot ALTER in a foreign key
+    with op.batch_alter_table('document') as batch_op:
+        batch_op.add_column(sa.Column('content_hash', sa.String(64)))
+        batch_op.create_index('ix_document_content_hash', ['content_hash'])
+        batch_op.add_column(sa.Column('text_content', sa.Text))
+        batch_op.add_column(sa.Column('simhash', sa.BigInteger))
+        for column in BAND_COLUMNS:
+            batch_op.add_column(sa.Column(column, sa.Integer))
+            batch_op.create_index(f'ix_document_{column}', [column])
+        batch_op.add_column(sa.Column('duplicate_of_id', sa.Integer))
+        batch_op.create_foreign_key('fk_document_duplicate_of_id', 'document', ['duplicate_of_id'], ['id'])
+
+def downgrade():
+    # Remove the columns and their indexes
+    with op.batch_alter_table('document') as batch_op:
+        batch_op.drop_constraint('fk_document_duplicate_of_id', type_='foreignkey')
+        batch_op.drop_column('duplicate_of_id')
+        for column in reversed(BAND_COLUMNS):
+            batch_op.drop_index(f'ix_document_{column}')
+            batch_op.drop_column(column)
+        batch_op.drop_column('simhash')
+        batch_op.drop_column('text_content')
+        batch_op.drop_index('ix_document_content_hash')
+        batch_op.drop_column('content_hash')
@@ -14,6 +14,14 @@ class Document(db.Model):
     doc_metadata = db.Column(JSON)  # Renamed from metadata to doc_metadata
     processing_attempts = db.Column(db.Integer, default=1)  # Track conversion attempts
     processing_method = db.Column(db.String(50))  # Store which method succeeded
+    content_hash = db.Column(db.String(64), index=True)  # blake2b of normalized text, for exact matches
+    text_content = db.Column(db.Text)  # Extracted text, diffed against near-duplicate uploads
+    simhash = db.Column(db.BigInteger)  # Signed 64-bit SimHash of extracted text
+    simhash_band_0 = db.Column(db.Integer, index=True)  # LSH buckets: 16-bit bands of simhash
+    simhash_band_1 = db.Column(db.Integer, index=True)
+    simhash_band_2 = db.Column(db.Integer, index=True)
+    simhash_band_3 = db.Column(db.Integer, index=True)
+    duplicate_of_id = db.Column(db.Integer, db.ForeignKey('document.id'))  # Identical or near-identical earlier document
 
 class ErrorLog(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -4,9 +4,12 @@ import json
 from datetime import datetime
 from flask import render_template, request, jsonify
 from werkzeug.utils import secure_filename
+from sqlalchemy import or_
 from app import app, db
 from models import Document, ErrorLog
 from utils.document_processor import process_document, allowed_file, check_file_size, normalize_filename
+from utils.fingerprint import (simhash_bands, to_signed, hamming_distance, similarity, text_changes,
+                               SIMHASH_MAX_DISTANCE, MAX_CHANGED_RATIO)
 
 # Set up logging with more detailed format
 logging.basicConfig(
@@ -50,6 +53,91 @@ def log_error(error_type, message, stack_trace=None, metadata=None):
     except Exception as e:
         logger.error(f"Failed to log error to database: {str(e)}")
 
+def find_identical_document(content_hash):
+    """Find a previously analyzed document whose normalized text is identical."""
+    if content_hash is None:
+        return None
+    return Document.query.filter(
+        Document.analysis_complete.is_(True),
+        Document.content_hash == content_hash
+    ).order_by(Document.id).first()
+
+def find_near_duplicate(fingerprint, max_distance=SIMHASH_MAX_DISTANCE):
+    """
+    Find the previously analyzed document whose SimHash is closest to the
+    given one, within max_distance bits. Candidates are fetched through the
+    indexed LSH band columns, so only matching buckets are scanned; every
+    candidate is checked so the nearest match is never cut off.
+    """
+    if fingerprint is None:
+        return None, None
+
+    bands = simhash_bands(fingerprint)
+    band_columns = [Document.simhash_band_0, Document.simhash_band_1,
+                    Document.simhash_band_2, Document.simhash_band_3]
+    candidates = db.session.query(Document.id, Document.simhash).filter(
+        Document.analysis_complete.is_(True),
+        or_(*[column == band for column, band in zip(band_columns, bands)])
+    ).all()
+
+    best_id, best_distance = None, None
+    for candidate_id, candidate_simhash in candidates:
+        distance = hamming_distance(candidate_simhash, fingerprint)
+        if distance <= max_distance and (best_distance is None or distance < best_distance):
+            best_id, best_distance = candidate_id, distance
+
+    logger.debug(f"Checked {len(candidates)} near-duplicate candidates")
+    if best_id is None:
+        return None, None
+    logger.info(f"Found near-duplicate document {best_id} at Hamming distance {best_distance}")
+    return db.session.get(Document, best_id), best_distance
+
+def load_insights(document):
+    """Decode a document's stored analysis (saved as a JSON string in a JSON column)."""
+    insights = document.insights
+    if isinstance(insights, str):
+        insights = json.loads(insights)
+    return insights
+
+def analyze_with_duplicates(text_content, fingerprint):
+    """
+    Analyze document text, reusing earlier analyses where possible:
+    - identical normalized text reuses the earlier analysis as-is;
+    - a SimHash near-duplicate whose word-level diff is empty (e.g. only
+      hyphenation differs) reuses it as-is too;
+    - a near-duplicate with up to MAX_CHANGED_RATIO of its words changed
+      sends only the changed passages and the earlier analysis to the model;
+    - anything else gets a full analysis.
+    Returns the analysis, the matched earlier document (or None), how the
+    analysis was produced ('reused', 'updated' or 'full') and the number of
+    changed passages.
+    """
+    from utils.ai_analyzer import analyze_document, update_analysis
+
+    duplicate = find_identical_document(fingerprint['content_hash'])
+    if duplicate:
+        logger.info(f"Reusing AI analysis from identical document {duplicate.id}")
+        return load_insights(duplicate), duplicate, 'reused', 0
+
+    duplicate, _ = find_near_duplicate(fingerprint['simhash'])
+    if duplicate and duplicate.text_content:
+        changes, changed_ratio = text_changes(duplicate.text_content, text_content)
+        logger.debug(f"{len(changes)} changed passages ({changed_ratio:.1%} of words) "
+                     f"against document {duplicate.id}")
+        if not changes:
+            logger.info(f"Reusing AI analysis from equivalent document {duplicate.id}")
+            return load_insights(duplicate), duplicate, 'reused', 0
+        if changed_ratio <= MAX_CHANGED_RATIO:
+            logger.debug("Starting incremental AI analysis")
+            analysis_results = update_analysis(load_insights(duplicate), changes)
+            logger.info(f"Updated AI analysis from document {duplicate.id}")
+            return analysis_results, duplicate, 'updated', len(changes)
+
+    logger.debug("Starting AI analysis")
+    analysis_results = analyze_document(text_content)
+    logger.info("AI analysis completed successfully")
+    return analysis_results, duplicate, 'full', 0
+
 @app.route('/upload', methods=['POST'])
 def upload_file():
     """Handle document upload and processing with improved error handling and Unicode support."""
@@ -103,14 +191,14 @@ def upload_file():
 
             try:
                 # Process document and extract text/metadata
-                text_content, metadata = process_document(file_path)
+                text_content, metadata, fingerprint = process_document(file_path)
                 logger.info(f"Document processed successfully with metadata: {metadata}")
 
-                # Analyze content with AI
-                from utils.ai_analyzer import analyze_document
-                logger.debug("Starting AI analysis")
-                analysis_results = analyze_document(text_content)
-                logger.info("AI analysis completed successfully")
+                # Analyze content with AI, reusing or diffing against earlier documents
+                simhash = fingerprint['simhash']
+                analysis_results, duplicate, analysis_source, change_count = analyze_with_duplicates(
+                    text_content, fingerprint
+                )
 
                 # Convert Python objects to JSON strings before database insertion
                 insights_json = json.dumps(analysis_results)
@@ -128,8 +216,15 @@ def upload_file():
                     summary=summary,
                     insights=insights_json,
                     doc_metadata=metadata_json,
-                    processing_method='markitdown' if 'markdown_content' in metadata else 'python-docx'
+                    processing_method='markitdown' if 'markdown_content' in metadata else 'python-docx',
+                    text_content=text_content,
+                    content_hash=fingerprint['content_hash'],
+                    duplicate_of_id=duplicate.id if duplicate else None
                 )
+                if simhash is not None:
+                    document.simhash = to_signed(simhash)
+                    (document.simhash_band_0, document.simhash_band_1,
+                     document.simhash_band_2, document.simhash_band_3) = simhash_bands(simhash)
                 db.session.add(document)
                 db.session.commit()
                 logger.info(f"Document {filename} saved to database with metadata")
@@ -147,7 +242,14 @@ def upload_file():
                     'insights': analysis_results.get('key_points', []),
                     'topics': analysis_results.get('main_topics', []),
                     'entities': analysis_results.get('important_entities', []),
-                    'metadata': metadata
+                    'metadata': metadata,
+                    'duplicate_of': {
+                        'id': duplicate.id,
+                        'similarity': similarity(duplicate.simhash, simhash)
+                        if duplicate.simhash is not None and simhash is not None else None,
+                        'analysis': analysis_source,
+                        'changes': change_count
+                    } if duplicate else None
                 })
 
             except Exception as e:
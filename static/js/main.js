@@ -496,6 +496,29 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
+    function createDuplicateNotice(duplicateOf) {
+        const notice = document.createElement('div');
+        notice.className = 'alert alert-info d-flex align-items-center mb-3';
+
+        const icon = document.createElement('i');
+        icon.setAttribute('data-feather', 'copy');
+        icon.className = 'me-2';
+
+        const similarity = duplicateOf.similarity !== null ? `${Math.round(duplicateOf.similarity * 100)}% ` : '';
+        const messages = {
+            reused: `This document matches previously analyzed document #${duplicateOf.id}; its analysis was reused.`,
+            updated: `This document is ${similarity}similar to previously analyzed document #${duplicateOf.id}; ` +
+                `its analysis was updated for ${duplicateOf.changes} changed passage(s).`,
+            full: `This document is ${similarity}similar to previously analyzed document #${duplicateOf.id}; ` +
+                `it was analyzed in full.`
+        };
+        const message = document.createElement('span');
+        message.textContent = messages[duplicateOf.analysis] || messages.full;
+
+        notice.append(icon, message);
+        return notice;
+    }
+
     function displayResults(data) {
         const resultsHtml = `
             <div class="paper-container">
@@ -519,5 +542,9 @@ document.addEventListener('DOMContentLoaded', function() {
             </div>
         `;
         resultsContainer.innerHTML = resultsHtml;
+        if (data.duplicate_of) {
+            resultsContainer.querySelector('h3').after(createDuplicateNotice(data.duplicate_of));
+        }
+        feather.replace();
     }
 });
\ No newline at end of file
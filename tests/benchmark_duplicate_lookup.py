@@ -0,0 +1,147 @@
+"""
+Benchmark the near-duplicate band lookup used by routes.find_near_duplicate.
+
+Seeds a document table with the same fingerprint columns and indexes as
+models.Document, then times the indexed band query plus the Hamming filter.
+
+    python tests/benchmark_duplicate_lookup.py [--rows 300000] [--queries 2000]
+    DATABASE_URL=postgresql://... python tests/benchmark_duplicate_lookup.py
+
+The table is built standalone because importing models pulls in the Flask app
+and its OpenAI clients.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+import sqlalchemy as sa
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.fingerprint import (simhash_bands, to_signed, hamming_distance,  # noqa: E402
+                               SIMHASH_BITS, SIMHASH_MAX_DISTANCE)
+
+metadata = sa.MetaData()
+document = sa.Table(
+    'benchmark_document', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('analysis_complete', sa.Boolean, default=True),
+    sa.Column('content_hash', sa.String(64), index=True),
+    sa.Column('simhash', sa.BigInteger),
+    sa.Column('simhash_band_0', sa.Integer, index=True),
+    sa.Column('simhash_band_1', sa.Integer, index=True),
+    sa.Column('simhash_band_2', sa.Integer, index=True),
+    sa.Column('simhash_band_3', sa.Integer, index=True),
+)
+BAND_COLUMNS = [document.c.simhash_band_0, document.c.simhash_band_1,
+                document.c.simhash_band_2, document.c.simhash_band_3]
+
+def _near(rng, fingerprint, max_bits):
+    for bit in rng.sample(range(SIMHASH_BITS), rng.randint(0, max_bits)):
+        fingerprint ^= 1 << bit
+    return fingerprint
+
+def seed(engine, rows, rng, revision_share=0.2):
+    """Insert random fingerprints, with a share of them as revisions of earlier ones."""
+    fingerprints = []
+    batch = []
+    with engine.begin() as conn:
+        for i in range(rows):
+            if fingerprints and rng.random() < revision_share:
+                fingerprint = _near(rng, rng.choice(fingerprints), SIMHASH_MAX_DISTANCE)
+            else:
+                fingerprint = rng.getrandbits(SIMHASH_BITS)
+            fingerprints.append(fingerprint)
+            bands = simhash_bands(fingerprint)
+            batch.append({
+                'analysis_complete': True,
+                'content_hash': f'{rng.getrandbits(256):064x}',
+                'simhash': to_signed(fingerprint),
+                **{f'simhash_band_{band}': value for band, value in enumerate(bands)}
+            })
+            if len(batch) == 10000:
+                conn.execute(document.insert(), batch)
+                batch = []
+        if batch:
+            conn.execute(document.insert(), batch)
+    return fingerprints
+
+def lookup_statement(fingerprint):
+    """Same query as routes.find_near_duplicate."""
+    bands = simhash_bands(fingerprint)
+    return sa.select(document.c.id, document.c.simhash).where(
+        document.c.analysis_complete.is_(True),
+        sa.or_(*[column == band for column, band in zip(BAND_COLUMNS, bands)])
+    )
+
+def find_near_duplicate(conn, fingerprint):
+    candidates = conn.execute(lookup_statement(fingerprint)).all()
+    best = None
+    for candidate_id, candidate_simhash in candidates:
+        distance = hamming_distance(candidate_simhash, fingerprint)
+        if distance <= SIMHASH_MAX_DISTANCE and (best is None or distance < best[1]):
+            best = (candidate_id, distance)
+    return best, len(candidates)
+
+def explain(conn, fingerprint):
+    statement = lookup_statement(fingerprint).compile(conn, compile_kwargs={'literal_binds': True})
+    prefix = 'EXPLAIN QUERY PLAN ' if conn.dialect.name == 'sqlite' else 'EXPLAIN ANALYZE '
+    return [' '.join(str(value) for value in row) for row in conn.exec_driver_sql(prefix + str(statement))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=300000)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    url = os.environ.get('DATABASE_URL')
+    tmpdir = None
+    if not url:
+        tmpdir = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{os.path.join(tmpdir.name, 'benchmark.db')}"
+    engine = sa.create_engine(url)
+
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+    start = time.perf_counter()
+    fingerprints = seed(engine, args.rows, rng)
+    print(f"Seeded {args.rows} rows on {engine.dialect.name} in {time.perf_counter() - start:.1f}s")
+
+    with engine.connect() as conn:
+        if engine.dialect.name == 'sqlite':
+            conn.exec_driver_sql('ANALYZE')
+        # Half the queries are revisions of stored documents, half are new documents
+        queries = [_near(rng, rng.choice(fingerprints), SIMHASH_MAX_DISTANCE) if i % 2 == 0
+                   else rng.getrandbits(SIMHASH_BITS) for i in range(args.queries)]
+        for fingerprint in queries[:50]:
+            find_near_duplicate(conn, fingerprint)  # warm up caches
+
+        timings, candidate_counts, misses = [], [], 0
+        for i, fingerprint in enumerate(queries):
+            start = time.perf_counter()
+            best, candidates = find_near_duplicate(conn, fingerprint)
+            timings.append((time.perf_counter() - start) * 1000)
+            candidate_counts.append(candidates)
+            if i % 2 == 0 and best is None:
+                misses += 1
+
+        timings.sort()
+        print(f"Lookups: {args.queries}, p50 {statistics.median(timings):.3f}ms, "
+              f"p99 {timings[int(len(timings) * 0.99) - 1]:.3f}ms, max {timings[-1]:.3f}ms")
+        print(f"Candidates per lookup: mean {statistics.mean(candidate_counts):.1f}, "
+              f"max {max(candidate_counts)}; missed revisions: {misses}")
+        print("Query plan:")
+        for line in explain(conn, queries[0]):
+            print(f"  {line}")
+
+    metadata.drop_all(engine)
+    if tmpdir:
+        tmpdir.cleanup()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+import io
+import os
+import random
+
+import pytest
+
+pytest.importorskip("flask_sqlalchemy")
+pytest.importorskip("markitdown")
+
+# Configure the app before it is imported: in-memory database, no real OpenAI key needed
+os.environ["DATABASE_URL"] = "sqlite:///:memory:"
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import routes  # noqa: E402
+import utils.ai_analyzer as ai_analyzer  # noqa: E402
+from app import app, db  # noqa: E402
+from models import Document  # noqa: E402
+from utils.fingerprint import (fingerprint_text, simhash_bands, to_signed,  # noqa: E402
+                               SIMHASH_BITS)
+
+_rng = random.Random(42)
+_VOCABULARY = [f"term{i}" for i in range(400)]
+CONTRACT = " ".join(_rng.choice(_VOCABULARY) for _ in range(3000)) + " The buyer pays 5000 USD to ACME Corp."
+REPORT = " ".join(_rng.choice(_VOCABULARY) for _ in range(3000))
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    app.config["TESTING"] = True
+    app.config["UPLOAD_FOLDER"] = str(tmp_path)
+
+    # Treat the uploaded bytes as the extracted text
+    def fake_process_document(file_path):
+        with open(file_path, encoding="utf-8") as f:
+            text = f.read()
+        return text, {}, fingerprint_text(text)
+
+    calls = {"analyze": [], "update": []}
+
+    def fake_analyze_document(text):
+        calls["analyze"].append(text)
+        return {"summary": "Contract summary", "key_points": ["Buyer pays 5000 USD"],
+                "important_entities": ["ACME Corp"]}
+
+    def fake_update_analysis(previous_analysis, changes):
+        calls["update"].append((previous_analysis, changes))
+        return dict(previous_analysis, summary="Revised contract summary",
+                    key_points=["Buyer pays 6000 USD"])
+
+    monkeypatch.setattr(routes, "process_document", fake_process_document)
+    monkeypatch.setattr(ai_analyzer, "analyze_document", fake_analyze_document)
+    monkeypatch.setattr(ai_analyzer, "update_analysis", fake_update_analysis)
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        with app.test_client() as test_client:
+            test_client.ai_calls = calls
+            yield test_client
+        db.session.remove()
+
+def upload(client, text, filename="contract.pdf"):
+    response = client.post("/upload", data={"file": (io.BytesIO(text.encode("utf-8")), filename)},
+                           content_type="multipart/form-data")
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+def test_identical_upload_reuses_analysis(client):
+    first = upload(client, CONTRACT)
+    second = upload(client, "  " + CONTRACT.upper(), filename="contract-copy.pdf")
+
+    assert len(client.ai_calls["analyze"]) == 1
+    assert client.ai_calls["update"] == []
+    assert first["duplicate_of"] is None
+    original = Document.query.order_by(Document.id).first()
+    assert second["duplicate_of"] == {"id": original.id, "similarity": 1.0, "analysis": "reused", "changes": 0}
+    assert second["summary"] == first["summary"]
+    assert second["insights"] == ["Buyer pays 5000 USD"]
+
+    copy = Document.query.order_by(Document.id.desc()).first()
+    assert copy.duplicate_of_id == original.id
+    assert copy.content_hash == original.content_hash
+
+def test_fingerprint_columns_are_stored(client):
+    upload(client, CONTRACT)
+
+    document = Document.query.one()
+    fingerprint = fingerprint_text(CONTRACT)
+    assert document.simhash == to_signed(fingerprint["simhash"])
+    assert -(1 << (SIMHASH_BITS - 1)) <= document.simhash < (1 << (SIMHASH_BITS - 1))
+    assert [document.simhash_band_0, document.simhash_band_1,
+            document.simhash_band_2, document.simhash_band_3] == simhash_bands(fingerprint["simhash"])
+    assert document.text_content == CONTRACT
+
+def test_revision_updates_analysis_from_changes(client):
+    upload(client, CONTRACT)
+    revised = upload(client, CONTRACT.replace("5000", "6000"), filename="contract-v2.docx")
+
+    assert len(client.ai_calls["analyze"]) == 1
+    assert len(client.ai_calls["update"]) == 1
+    previous_analysis, changes = client.ai_calls["update"][0]
+    assert previous_analysis["key_points"] == ["Buyer pays 5000 USD"]
+    assert len(changes) == 1
+    assert changes[0]["context_before"].endswith("The buyer pays")
+    assert (changes[0]["removed"], changes[0]["added"]) == ("5000", "6000")
+    assert changes[0]["context_after"] == "USD to ACME Corp"
+
+    original, revision = Document.query.order_by(Document.id).all()
+    assert revised["duplicate_of"]["id"] == original.id
+    assert revised["duplicate_of"]["analysis"] == "updated"
+    assert revised["duplicate_of"]["changes"] == 1
+    assert revised["insights"] == ["Buyer pays 6000 USD"]
+    assert revision.duplicate_of_id == original.id
+
+def test_hyphenation_only_difference_reuses_analysis(client):
+    upload(client, CONTRACT)
+    words = CONTRACT.split(" ")
+    words[10] = words[10][:3] + "-\n" + words[10][3:]
+    reexported = upload(client, " ".join(words), filename="contract.docx")
+
+    assert len(client.ai_calls["analyze"]) == 1
+    assert client.ai_calls["update"] == []
+    assert reexported["duplicate_of"]["analysis"] == "reused"
+
+def test_unrelated_upload_gets_full_analysis(client):
+    upload(client, CONTRACT)
+    unrelated = upload(client, REPORT, filename="report.pdf")
+
+    assert len(client.ai_calls["analyze"]) == 2
+    assert unrelated["duplicate_of"] is None
+    assert Document.query.order_by(Document.id.desc()).first().duplicate_of_id is None
+
+def test_find_near_duplicate_picks_nearest_complete_document(client):
+    fingerprint = fingerprint_text(CONTRACT)["simhash"]
+
+    def add_document(simhash, analysis_complete=True):
+        document = Document(filename="f.pdf", original_filename="f.pdf", file_type="pdf",
+                            analysis_complete=analysis_complete, simhash=to_signed(simhash))
+        (document.simhash_band_0, document.simhash_band_1,
+         document.simhash_band_2, document.simhash_band_3) = simhash_bands(simhash)
+        db.session.add(document)
+        db.session.commit()
+        return document
+
+    add_document(fingerprint ^ 0b111)
+    nearest = add_document(fingerprint ^ 0b1)
+    add_document(fingerprint, analysis_complete=False)
+    add_document(fingerprint ^ 0b1111)
+
+    match, distance = routes.find_near_duplicate(fingerprint)
+    assert match.id == nearest.id
+    assert distance == 1
+    assert routes.find_near_duplicate(fingerprint ^ ((1 << SIMHASH_BITS) - 1)) == (None, None)
+    assert routes.find_near_duplicate(None) == (None, None)
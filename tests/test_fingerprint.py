@@ -0,0 +1,88 @@
+import random
+
+import pytest
+
+from utils.fingerprint import (compute_simhash, compute_content_hash, fingerprint_text, text_changes,
+                               simhash_bands, to_signed, to_unsigned, hamming_distance,
+                               similarity, SIMHASH_BITS, SIMHASH_BANDS, SIMHASH_BAND_BITS,
+                               SIMHASH_MAX_DISTANCE, MAX_CHANGED_RATIO)
+
+SAMPLE_TEXT = " ".join(f"clause{i % 97} party{i % 13} amount{i % 31}" for i in range(1000))
+
+def _flip_bits(fingerprint, bits):
+    for bit in bits:
+        fingerprint ^= 1 << bit
+    return fingerprint
+
+@pytest.mark.parametrize("value", [0, 1, (1 << 63) - 1, 1 << 63, (1 << 64) - 1, 0x8000_0000_dead_beef])
+def test_signed_round_trip(value):
+    signed = to_signed(value)
+    assert -(1 << 63) <= signed < (1 << 63)
+    assert to_unsigned(signed) == value
+
+def test_bands_reassemble_fingerprint():
+    rng = random.Random(0)
+    for _ in range(1000):
+        fingerprint = rng.getrandbits(SIMHASH_BITS)
+        bands = simhash_bands(fingerprint)
+        assert len(bands) == SIMHASH_BANDS
+        assert all(0 <= band < (1 << SIMHASH_BAND_BITS) for band in bands)
+        assert sum(band << (i * SIMHASH_BAND_BITS) for i, band in enumerate(bands)) == fingerprint
+
+def test_fingerprints_within_max_distance_share_a_band():
+    rng = random.Random(1)
+    for _ in range(5000):
+        fingerprint = rng.getrandbits(SIMHASH_BITS)
+        flipped = rng.sample(range(SIMHASH_BITS), rng.randint(0, SIMHASH_MAX_DISTANCE))
+        other = _flip_bits(fingerprint, flipped)
+        assert hamming_distance(fingerprint, other) == len(flipped)
+        assert set(enumerate(simhash_bands(fingerprint))) & set(enumerate(simhash_bands(other)))
+
+def test_worst_case_spread_still_shares_a_band():
+    # One flipped bit in each of SIMHASH_MAX_DISTANCE bands leaves the last band intact
+    fingerprint = 0x0123_4567_89ab_cdef
+    other = _flip_bits(fingerprint, [band * SIMHASH_BAND_BITS for band in range(SIMHASH_MAX_DISTANCE)])
+    assert simhash_bands(fingerprint)[-1] == simhash_bands(other)[-1]
+
+def test_hamming_distance_accepts_signed_values():
+    a, b = (1 << 64) - 1, (1 << 63) - 1
+    assert hamming_distance(a, b) == 1
+    assert hamming_distance(to_signed(a), to_signed(b)) == 1
+    assert similarity(a, a) == 1.0
+
+def test_simhash_is_stable_and_normalized():
+    fingerprint = compute_simhash(SAMPLE_TEXT)
+    assert 0 <= fingerprint < (1 << SIMHASH_BITS)
+    assert compute_simhash(SAMPLE_TEXT) == fingerprint
+    assert compute_simhash("  " + SAMPLE_TEXT.upper().replace(" ", "\n")) == fingerprint
+
+def test_simhash_separates_unrelated_text():
+    unrelated = " ".join(f"revenue{i % 53} quarter{i % 7}" for i in range(1000))
+    assert hamming_distance(compute_simhash(SAMPLE_TEXT), compute_simhash(unrelated)) > SIMHASH_MAX_DISTANCE
+
+def test_empty_text_has_no_fingerprint():
+    assert fingerprint_text("") == {'content_hash': None, 'simhash': None}
+    assert fingerprint_text(" .,;\n") == {'content_hash': None, 'simhash': None}
+
+def test_content_hash_only_matches_identical_words():
+    content_hash = compute_content_hash(SAMPLE_TEXT)
+    assert compute_content_hash(SAMPLE_TEXT.upper().replace(" ", "  \n")) == content_hash
+    revised = SAMPLE_TEXT.replace("amount5 ", "amount6 ", 1)
+    assert compute_content_hash(revised) != content_hash
+
+def test_text_changes_lists_changed_words_with_context():
+    old = "The buyer pays 5000 USD on 1 March 2024 to ACME Corp."
+    changes, changed_ratio = text_changes(old, old.replace("5000", "6000").replace("ACME", "Globex"))
+    assert [(c["removed"], c["added"]) for c in changes] == [("5000", "6000"), ("ACME", "Globex")]
+    assert changes[0]["context_before"] == "The buyer pays"
+    assert changes[1]["context_after"] == "Corp"
+    assert changed_ratio == pytest.approx(2 / 12)
+
+def test_text_changes_ignores_case_whitespace_and_hyphenation():
+    changes, changed_ratio = text_changes(SAMPLE_TEXT, SAMPLE_TEXT.upper().replace("CLAUSE5 ", "CLAU-\nSE5 ", 1))
+    assert changes == []
+    assert changed_ratio == 0
+
+def test_text_changes_ratio_exceeds_limit_for_rewrites():
+    _, changed_ratio = text_changes(SAMPLE_TEXT, " ".join(f"rewritten{i}" for i in range(3000)))
+    assert changed_ratio > MAX_CHANGED_RATIO
@@ -63,6 +63,37 @@ def analyze_document(text):
     except Exception as e:
         raise Exception(f"Failed to analyze document: {str(e)}")
 
+def update_analysis(previous_analysis, changes):
+    """
+    Update an earlier analysis for a revised document, sending only the
+    changed passages instead of the full text.
+    """
+    try:
+        response = openai.chat.completions.create(
+            model="gpt-4o",
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You are given a JSON analysis of a document and the passages that changed "
+                    "in a revised version of it. Each change lists the removed and added words with "
+                    "surrounding context. Update the analysis so that it is accurate for the revised "
+                    "document, paying attention to changed figures, dates, names and parties. "
+                    "Keep the same keys and structure and leave unaffected content unchanged. "
+                    "Respond in JSON format."
+                },
+                {"role": "user", "content": json.dumps({
+                    "previous_analysis": previous_analysis,
+                    "changes": changes
+                })}
+            ],
+            response_format={"type": "json_object"}
+        )
+        analysis = dict(previous_analysis)
+        analysis.update(json.loads(response.choices[0].message.content))
+        return analysis
+    except Exception as e:
+        raise Exception(f"Failed to update document analysis: {str(e)}")
+
 def extract_key_points(text):
     try:
         response = openai.chat.completions.create(
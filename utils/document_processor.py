@@ -7,6 +7,7 @@ from markitdown import MarkItDown
 from openai import OpenAI
 from docx import Document as DocxDocument
 import datetime
+from utils.fingerprint import fingerprint_text
 
 # Set up logging with more detailed format
 logging.basicConfig(
@@ -225,7 +226,11 @@ def allowed_file(filename):
         return False
 
 def process_document(file_path):
-    """Process a document file and extract its text content with metadata."""
+    """
+    Process a document file and extract its text content with metadata.
+    Returns the text, the document metadata and the text fingerprint
+    (exact content hash and SimHash) used for duplicate detection.
+    """
     logger.debug(f"Starting document processing for: {file_path}")
     try:
         if not os.path.exists(file_path):
@@ -248,13 +253,16 @@ def process_document(file_path):
         logger.debug(f"File size: {file_size / 1024:.1f}KB")
 
         if file_extension == '.pdf':
-            return extract_text_from_pdf(file_path), {}
+            text, metadata = extract_text_from_pdf(file_path), {}
         elif file_extension in ['.doc', '.docx']:
-            return extract_text_from_word(file_path)
+            text, metadata = extract_text_from_word(file_path)
         else:
             logger.error(f"Unsupported file type: {file_extension}")
             raise ValueError(f"Unsupported file type: {file_extension}")
 
+        # Fingerprint the extracted text for duplicate detection
+        return text, metadata, fingerprint_text(text)
+
     except Exception as e:
         logger.error(f"Error in process_document: {str(e)}", exc_info=True)
         # Clean up the file if there was an error
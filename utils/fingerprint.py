@@ -0,0 +1,138 @@
+import re
+import difflib
+import hashlib
+import logging
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+# SimHash parameters. The 64-bit fingerprint is split into SIMHASH_BANDS
+# bands of equal width; by the pigeonhole principle two fingerprints within
+# SIMHASH_BANDS - 1 bits of each other share at least one identical band, so
+# an exact lookup on the indexed band columns finds every candidate.
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 4
+SIMHASH_BAND_BITS = SIMHASH_BITS // SIMHASH_BANDS
+SIMHASH_MAX_DISTANCE = SIMHASH_BANDS - 1
+SHINGLE_SIZE = 3
+
+# Word-level diffing of near-duplicates. Each changed passage carries a few
+# words of context; above MAX_CHANGED_RATIO of the document the delta is no
+# cheaper than the full text, so the caller should analyze it from scratch.
+CHANGE_CONTEXT_TOKENS = 8
+MAX_CHANGED_RATIO = 0.2
+
+_TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+def _tokens(text):
+    """Split text into lowercase word tokens, ignoring punctuation and whitespace."""
+    return _TOKEN_PATTERN.findall((text or '').lower())
+
+def _shingles(text):
+    """Split text into overlapping word shingles, normalized for case and whitespace."""
+    tokens = _tokens(text)
+    if len(tokens) < SHINGLE_SIZE:
+        return [' '.join(tokens)] if tokens else []
+    return [' '.join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)]
+
+def _hash64(value):
+    """Stable 64-bit hash of a string (Python's hash() is salted per process)."""
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+
+def compute_simhash(text):
+    """
+    Compute a 64-bit SimHash fingerprint of the document text.
+    Near-identical texts yield fingerprints with a small Hamming distance.
+    Returns None if the text has no tokens.
+    """
+    shingles = Counter(_shingles(text))
+    if not shingles:
+        return None
+
+    vector = [0] * SIMHASH_BITS
+    for shingle, weight in shingles.items():
+        h = _hash64(shingle)
+        for bit in range(SIMHASH_BITS):
+            if h & (1 << bit):
+                vector[bit] += weight
+            else:
+                vector[bit] -= weight
+
+    fingerprint = 0
+    for bit in range(SIMHASH_BITS):
+        if vector[bit] > 0:
+            fingerprint |= 1 << bit
+
+    logger.debug(f"Computed SimHash {fingerprint:016x} from {len(shingles)} shingles")
+    return fingerprint
+
+def compute_content_hash(text):
+    """
+    Compute an exact hash of the normalized document text. Unlike the SimHash,
+    two documents only share a content hash if their words are identical, so
+    it is safe to reuse an earlier analysis on a match.
+    Returns None if the text has no tokens.
+    """
+    tokens = _tokens(text)
+    if not tokens:
+        return None
+    return hashlib.blake2b(' '.join(tokens).encode('utf-8'), digest_size=32).hexdigest()
+
+def fingerprint_text(text):
+    """Compute the exact content hash and the SimHash fingerprint of the document text."""
+    return {
+        'content_hash': compute_content_hash(text),
+        'simhash': compute_simhash(text)
+    }
+
+def to_signed(fingerprint):
+    """Convert an unsigned 64-bit fingerprint to the signed range of a BIGINT column."""
+    return fingerprint - (1 << SIMHASH_BITS) if fingerprint >= (1 << (SIMHASH_BITS - 1)) else fingerprint
+
+def to_unsigned(value):
+    """Convert a signed BIGINT column value back to an unsigned 64-bit fingerprint."""
+    return value & ((1 << SIMHASH_BITS) - 1)
+
+def simhash_bands(fingerprint):
+    """Split a fingerprint into SIMHASH_BANDS integer LSH bucket keys."""
+    mask = (1 << SIMHASH_BAND_BITS) - 1
+    return [(fingerprint >> (band * SIMHASH_BAND_BITS)) & mask for band in range(SIMHASH_BANDS)]
+
+def hamming_distance(a, b):
+    """Number of differing bits between two fingerprints."""
+    return bin(to_unsigned(a) ^ to_unsigned(b)).count('1')
+
+def similarity(a, b):
+    """Similarity in [0, 1] derived from the Hamming distance of two fingerprints."""
+    return 1 - hamming_distance(a, b) / SIMHASH_BITS
+
+def text_changes(old_text, new_text, context=CHANGE_CONTEXT_TOKENS):
+    """
+    List the passages that differ between two texts at word level, ignoring
+    case, punctuation and whitespace. Changes that only re-split words, such
+    as hyphenation across PDF line breaks, are dropped.
+    Returns the list of changes and the share of the new text they cover.
+    """
+    old_words = _TOKEN_PATTERN.findall(old_text or '')
+    new_words = _TOKEN_PATTERN.findall(new_text or '')
+    matcher = difflib.SequenceMatcher(
+        None, [w.lower() for w in old_words], [w.lower() for w in new_words], autojunk=False
+    )
+
+    changes = []
+    changed_words = 0
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            continue
+        removed, added = old_words[i1:i2], new_words[j1:j2]
+        if ''.join(removed).lower() == ''.join(added).lower():
+            continue
+        changed_words += max(len(removed), len(added))
+        changes.append({
+            'context_before': ' '.join(new_words[max(0, j1 - context):j1]),
+            'removed': ' '.join(removed),
+            'added': ' '.join(added),
+            'context_after': ' '.join(new_words[j2:j2 + context])
+        })
+
+    return changes, changed_words / max(len(new_words), 1)